@@ -14,10 +14,44 @@ import matplotlib.patches as mpatches
 import matplotlib.dates as mdates
 import matplotlib.ticker as mtick
 from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection
 
 import seaborn as sns
 import datetime
 
+from numba import njit, prange
+
+
+@njit(cache=True, parallel=True)
+def _sign_matrix(vals, out):
+    """ Numba kernel to compute day-over-day response signs, one model per column
+
+    Fuses the difference, sign and first-day/NaN handling into a single pass,
+    parallelized over models. NaN differences count as increased
+
+    """
+    for j in prange(vals.shape[1]):
+        out[0, j] = 1
+        for i in range(1, vals.shape[0]):
+            d = vals[i, j]-vals[i-1, j]
+            if d!=d or d>0:
+                out[i, j] = 1
+            elif d<0:
+                out[i, j] = -1
+            else:
+                out[i, j] = 0
+
+
+@njit(cache=True)
+def _success_rate(pos, total, out):
+    """ Numba kernel to compute success rates in one pass over the raw arrays
+
+    """
+    for i in range(pos.shape[0]):
+        t = total[i]
+        out[i] = pos[i]*100.0/t if t>0 else 0.0
+    return out
+
 
 class ModelReport:
     """
@@ -84,6 +118,7 @@ class ModelReport:
         self.modelAUC = performance
         self.modelSnapshot = snapshot
         self.cols = ['model ID', 'issue', 'group', 'channel', 'direction', 'model name', 'positives', 'responses', 'model performance', 'model snapshot']
+        self._query_cache = {}
         self._check_data_shape()
         self.dfModel, self.latestModels = self._create_model_df()
 
@@ -92,21 +127,31 @@ class ModelReport:
         """ Sets correct data type for certain dataframe columns
 
         """
-        for col in ['issue', 'group', 'channel', 'direction', 'model name']:
+        for col in ['issue', 'group', 'channel', 'direction']:
             df[col] = df[col].astype(str)
-        df['model snapshot'] = pd.to_datetime(df['model snapshot'])
+        df['model name'] = df['model name'].astype('category')
+        if not np.issubdtype(df['model snapshot'].dtype, np.datetime64):
+            df['model snapshot'] = pd.to_datetime(df['model snapshot'])
         return df
 
+    @staticmethod
+    def _check_equal_lengths(*arrays):
+        """ Ensure all input arrays have the same number of rows
+
+        Raises:
+            ValueError: if the row counts differ
+        """
+        lengths = [a.shape[0] for a in arrays]
+        if len(set(lengths))>1:
+            raise ValueError("All input data must have the same number of rows: got %s" % lengths)
+
     def _check_data_shape(self):
         """ Ensure input data has the correct shape
 
         """
-        if not self.modelID.shape[0]==self.issue.shape[0]==self.group.shape[
-                0]==self.channel.shape[0]==self.direction.shape[
-                    0]==self.modelName.shape[0]==self.positives.shape[
-                        0]==self.responses.shape[0]==self.modelAUC.shape[
-                            0]==self.modelSnapshot.shape[0]:
-            raise TypeError("All input data must have the same number of rows")
+        self._check_equal_lengths(self.modelID, self.issue, self.group, self.channel,
+                                  self.direction, self.modelName, self.positives,
+                                  self.responses, self.modelAUC, self.modelSnapshot)
 
     def _create_model_df(self):
         """ Generate model dataframes
@@ -120,13 +165,16 @@ class ModelReport:
         rtype: tuple
 
         """
-        df_all = pd.DataFrame.from_dict(dict(
+        df_all = pd.DataFrame(dict(
             zip(self.cols,[self.modelID, self.issue, self.group, self.channel,
-                           self.direction, self.modelName, self.positives, 
-                           self.responses, self.modelAUC, self.modelSnapshot] )))
+                           self.direction, self.modelName, self.positives,
+                           self.responses, self.modelAUC, self.modelSnapshot] )), copy=False)
+        for col in ['positives', 'responses']:
+            df_all[col] = pd.to_numeric(df_all[col], downcast='unsigned')
+        df_all['model performance'] = pd.to_numeric(df_all['model performance'], downcast='float')
         df_all = self._calculate_success_rate(df_all, 'positives', 'responses', 'success rate (%)')
         df_all = self._set_proper_type(df_all)
-        df_latest = df_all.sort_values('model snapshot').groupby(['model ID']).tail(1)
+        df_latest = df_all.loc[df_all.groupby('model ID', sort=False)['model snapshot'].idxmax()]
 
         return (df_all, df_latest)
 
@@ -145,16 +193,17 @@ class ModelReport:
         Returns:
             pandas dataframe
         """
-        df[label] = 0
-        df.loc[df[total]>0, label] = df[pos]*100.0/df[total]
-        df.loc[df[total]<=0, label] = 0
+        out = np.empty(df.shape[0])
+        df[label] = _success_rate(df[pos].to_numpy(np.float64), df[total].to_numpy(np.float64), out)
 
         return df
 
-    @staticmethod
-    def _apply_query(query, df):
+    def _apply_query(self, query, df):
         """ Given an input pandas dataframe, it filters the dataframe based on input query
 
+        Results are memoized per dataframe and query, so calling several plot
+        methods with the same query filters the dataframe only once
+
         Args:
             query (dict): a dict of lists where the key is column name in the dataframe and the corresponding
                    value is a list of values to keep in the dataframe
@@ -163,28 +212,32 @@ class ModelReport:
         Returns:
             filtered pandas dataframe
         """
-        #if 'model ID' in df.columns:
-        #    _df = df.drop('model ID', axis=1)
-        #else: 
-        _df = df.reset_index(drop=True)
         if query!={}:
             if not type(query)==dict:
                 raise TypeError('query must be a dict where values are lists')
             for key, val in query.items():
                 if not type(val)==list:
                     raise ValueError('query values must be list')
-
+        cache_key = (id(df), tuple(sorted((col, tuple(val)) for col, val in query.items())))
+        if cache_key in self._query_cache:
+            return self._query_cache[cache_key][1]
+        _df = df.reset_index(drop=True)
+        if query!={}:
+            mask = np.ones(_df.shape[0], dtype=bool)
             for col, val in query.items():
-                _df = _df[_df[col].isin(val)]
+                mask &= _df[col].isin(val).to_numpy()
+            _df = _df.loc[mask]
+        # the source dataframe is kept in the cache so its id cannot be recycled
+        self._query_cache[cache_key] = (df, _df)
         return _df
 
     @staticmethod
     def _create_sign_df(df):
         """ Generates dataframe to show whether responses decreased/increased from day to day
 
-        For a given dataframe where columns are dates and rows are model names,
-        subtracts each day's value from the previous day's value per model. Then masks the data.
-        If decreased (desired situtation), it will put 1 in the cell, if no change, it will
+        For a given dataframe where rows are dates and columns are model names,
+        subtracts each day's value from the previous day's value per model. Then takes the
+        sign of the difference. If increased, it will put 1 in the cell, if no change, it will
         put 0, and if decreased it will put -1. This dataframe then could be used in the heatmap
 
         Args:
@@ -194,17 +247,10 @@ class ModelReport:
             pandas dataframe
 
         """
-        vals = df.reset_index().values
-        cols = df.columns
-        _df = pd.DataFrame(np.hstack(
-                (np.array([[vals[i,0]] for i in range(vals.shape[0])]),
-                          np.array([vals[i,2:]-vals[i,1:-1]  for i in range(vals.shape[0])]))))
-        _df.columns = cols
-        _df.rename(columns={cols[0]:'model ID'}, inplace=True)
-        df_sign = _df.set_index('model ID').mask(_df.set_index('model ID')>0, 1)
-        df_sign = df_sign.mask(df_sign<0, -1)
-        df_sign[cols[0]] = 1
-        return df_sign[cols].fillna(1)
+        vals = df.to_numpy(np.float64)
+        signs = np.empty(vals.shape, np.int8)
+        _sign_matrix(vals, signs)
+        return pd.DataFrame(signs, index=df.index, columns=df.columns)
 
     def generate_heatmap_df(self, lookback, query, fill_null_days):
         """ Generates dataframes needed to plot calendar heatmap
@@ -225,20 +271,20 @@ class ModelReport:
         """
         df = self._apply_query(query, self.dfModel)
         df = df[['model ID', 'model snapshot', 'responses']].sort_values('model snapshot').reset_index(drop=True)
-        df['Date'] = pd.Series([i.date() for i in df['model snapshot']])
+        df['Date'] = df['model snapshot'].dt.normalize()
         df = df[df['Date']>(df['Date'].max()-datetime.timedelta(lookback))]
         if df.shape[0]<1:
             print("no data within lookback range")
             return pd.DataFrame()
         else:
-            idx = df.groupby(['model ID', 'Date'])['model snapshot'].transform(max)==df['model snapshot']
-            df = df[idx]
+            df = df.loc[df.groupby(['model ID', 'Date'], sort=False)['model snapshot'].idxmax()]
             if fill_null_days:
                 idx_date = pd.date_range(df['Date'].min(), df['Date'].max())
-                df = df.set_index('Date').groupby('model ID').apply(lambda d: d.reindex(idx_date)).drop(
-                    'model ID', axis=1).reset_index('model ID').reset_index().rename(columns={'index':'Date'})
-                df['Date'] = df['Date'].dt.date
-            df_annot = df.pivot(columns='Date', values='responses', index='model ID')
+                full_idx = pd.MultiIndex.from_product([df['model ID'].unique(), idx_date],
+                                                      names=['model ID', 'Date'])
+                df = df.set_index(['model ID', 'Date']).reindex(full_idx).reset_index()
+            df['Date'] = df['Date'].dt.date
+            df_annot = df.pivot(index='Date', columns='model ID', values='responses')
             df_sign = self._create_sign_df(df_annot)
         return (df_annot, df_sign)
 
@@ -260,7 +306,8 @@ class ModelReport:
         _df = self._apply_query(query, self.latestModels)
 
         if annotate:
-            gg = sns.relplot(x='model performance', y='success rate (%)', aspect=aspect, data=_df, hue='model name')
+            gg = sns.relplot(x='model performance', y='success rate (%)', aspect=aspect, data=_df,
+                             hue='model name', hue_order=_df['model name'].unique())
             ax = gg.axes[0,0]
             for idx,row in _df[['model performance', 'success rate (%)', 'responses']].sort_values(
                 'responses').reset_index(drop=True).reset_index().fillna(-1).iterrows():
@@ -271,7 +318,8 @@ class ModelReport:
             c._children = c._children[0:_df['model name'].count()+1]
         else:
             gg = sns.relplot(x='model performance', y='success rate (%)', size='responses',
-                             data=_df, hue='model name',  sizes=sizes, aspect=aspect)
+                             data=_df, hue='model name', hue_order=_df['model name'].unique(),
+                             sizes=sizes, aspect=aspect)
 
         gg.fig.set_size_inches(figsize[0], figsize[1])
         plt.setp(gg._legend.get_texts(), fontsize='10')
@@ -297,14 +345,18 @@ class ModelReport:
             fig, ax = plt.subplots(figsize=figsize)
             norm = colors.Normalize(vmin=0.5, vmax=1)
             mapper = plt.cm.ScalarMappable(norm=norm, cmap=plt.cm.gnuplot_r)
-            for ids in _df_g['model ID'].unique():
-                _df = _df_g[_df_g['model ID']==ids].sort_values('model snapshot')
-                name = _df['model name'].unique()[0]
-                ax.plot(_df['model snapshot'].values, _df['responses'].values, color='gray')
-                ax.scatter(_df['model snapshot'].values, _df['responses'].values,
-                           color=[mapper.to_rgba(v) for v in _df['model performance'].values])
-                if _df['responses'].max()>1:
-                    ax.text(_df['model snapshot'].max(),_df['responses'].max(),'   '+name, {'fontsize':9})
+            _df_g = _df_g.sort_values(['model ID', 'model snapshot'])
+            x = mdates.date2num(_df_g['model snapshot'])
+            y = _df_g['responses'].values
+            ids = _df_g['model ID'].values
+            breaks = np.flatnonzero(ids[1:]!=ids[:-1])+1
+            segments = np.split(np.column_stack((x, y)), breaks)
+            ax.add_collection(LineCollection(segments, colors='gray'))
+            ax.scatter(x, y, color=mapper.to_rgba(_df_g['model performance'].values))
+            ann = _df_g.groupby('model ID', sort=False).agg(
+                x=('model snapshot', 'max'), y=('responses', 'max'), name=('model name', 'first'))
+            for _, row in ann[ann['y']>1].iterrows():
+                ax.text(row['x'], row['y'], '   '+str(row['name']), {'fontsize':9})
             for i in ax.get_xmajorticklabels():
                 i.set_rotation(90)
             ax.set_ylabel('Responses')
@@ -334,14 +386,13 @@ class ModelReport:
         """
         f, ax = plt.subplots(figsize=figsize)
         annot_df, heatmap_df = self.generate_heatmap_df(lookback, query, fill_null_days)
-        heatmap_df = heatmap_df.reset_index().merge(self.dfModel[['model ID', 'model name']].drop_duplicates(), 
-                                                    on='model ID', how='left').drop('model ID', axis=1).set_index('model name')
-        annot_df = annot_df.reset_index().merge(self.dfModel[['model ID', 'model name']].drop_duplicates(), 
-                                                    on='model ID', how='left').drop('model ID', axis=1).set_index('model name')
+        modelnames = self.dfModel[['model ID', 'model name']].drop_duplicates().set_index('model ID').to_dict()['model name']
+        heatmap_df = heatmap_df.rename(columns=modelnames)
+        annot_df = annot_df.rename(columns=modelnames)
         myColors = ['r', 'orange', 'w']
         colorText = ['Decreased', 'No Change', 'Increased or NA']
         cmap = colors.ListedColormap(myColors)
-        sns.heatmap(heatmap_df.T, annot=annot_df.T, mask=annot_df.T.isnull(), ax=ax,
+        sns.heatmap(heatmap_df, annot=annot_df, mask=annot_df.isnull(), ax=ax,
                     linewidths=0.5, fmt='.0f', cmap=cmap, vmin=-1, vmax=1, cbar=False)
         bottom, top = ax.get_ylim()
         ax.set_ylim(bottom + 0.5, top - 0.5)
@@ -389,7 +440,8 @@ class ModelReport:
         """
         f, ax = plt.subplots(figsize=figsize)
         _df_g = self._apply_query(query, self.latestModels)
-        bplot = sns.barplot(x='success rate (%)', y='model name', data=_df_g.sort_values('success rate (%)', ascending=False), ax=ax)
+        order = _df_g['model name'].to_numpy()[np.argsort(-_df_g['success rate (%)'].to_numpy())]
+        bplot = sns.barplot(x='success rate (%)', y='model name', data=_df_g, order=order, ax=ax)
         ax.xaxis.set_major_formatter(mtick.PercentFormatter())
         for p in bplot.patches:
             bplot.annotate("{:0.2%}".format(p.get_width()/100.0), (p.get_width(), p.get_y()+p.get_height()/2),
@@ -427,6 +479,9 @@ class ADMReport(ModelReport):
 
         Attributes:
             predCols (list): name of columns in predictor dataframe
+            latestPredictors (pandas dataframe): latest predictor snapshots, with the model
+                name attached
+            modelNameByID (pandas series): maps model ID to model name
 
         """
         ModelReport.__init__(self, modelID, issue, group, channel, direction, 
@@ -444,34 +499,101 @@ class ADMReport(ModelReport):
         self._check_pred_data_shape()
         self.predCols = ['model ID', 'predictor name', 'predictor performance', 'bin symbol', 'bin index', 'entry type',
                          'predictor type', 'bin positives', 'bin responses', 'predictor snapshot']
-        self.latestPredModel = self._create_pred_model_df()
+        self.latestPredictors = self._create_pred_model_df()
+        self._latestPredModel = None
 
 
     def _check_pred_data_shape(self):
         """ Ensure input data has the correct shape
 
         """
-        if not self.predModelID.shape[0]==self.predName.shape[0]==self.predPerformance.shape[0]==self.binSymbol.shape[0]==self.binIndex.shape[0
-                    ]==self.entryType.shape[0]==self.predictorType.shape[0]==self.predSnapshot.shape[0]==self.binPositives.shape[0]==self.binResponses.shape[0]:
-            raise TypeError("All input data must have the same number of rows")
+        self._check_equal_lengths(self.predModelID, self.predName, self.predPerformance,
+                                  self.binSymbol, self.binIndex, self.entryType,
+                                  self.predictorType, self.predSnapshot, self.binPositives,
+                                  self.binResponses)
 
     def _create_pred_model_df(self):
         """
-        This method generates a pandas dataframes that contains all latest predictor data
-        merged with latest model snapshot.
-        bin propensity is also calculated and added as a new column
+        This method generates a pandas dataframe that contains all latest predictor data
+        with the model name attached.
+        bin propensity is also calculated and added as a new column.
+        The full merge with the latest model snapshots repeats every model row
+        for each predictor bin, so it is deferred to the latestPredModel property
 
         Returns:
             pandas dataframe
         """
-        _df = pd.DataFrame.from_dict(dict(
+        _df = pd.DataFrame(dict(
                 zip(self.predCols, [self.predModelID, self.predName, self.predPerformance, self.binSymbol, self.binIndex,
-                    self.entryType, self.predictorType, self.binPositives, self.binResponses, self.predSnapshot])))
-        idx = _df.groupby(['model ID', 'predictor name'])['predictor snapshot'].transform(max)==_df['predictor snapshot']
+                    self.entryType, self.predictorType, self.binPositives, self.binResponses, self.predSnapshot])), copy=False)
+        for col in ['bin positives', 'bin responses', 'bin index']:
+            _df[col] = pd.to_numeric(_df[col], downcast='unsigned')
+        _df['predictor performance'] = pd.to_numeric(_df['predictor performance'], downcast='float')
+        for col in ['predictor name', 'entry type', 'predictor type']:
+            _df[col] = _df[col].astype('category')
+        idx = _df.groupby(['model ID', 'predictor name'], observed=True, sort=False)['predictor snapshot'].transform('max')==_df['predictor snapshot']
         _df = _df[idx]
         _df = self._calculate_success_rate(_df, 'bin positives', 'bin responses', 'bin propensity')
-        latestPredModel = self.latestModels.merge(_df, on='model ID', how='right').drop(['predictor snapshot'], axis=1)
-        return latestPredModel
+        self.modelNameByID = self.latestModels.set_index('model ID')['model name']
+        _df['model name'] = _df['model ID'].map(self.modelNameByID).astype('category')
+        self._nonClassifierPreds = _df[_df['predictor name']!='Classifier']
+        self._classifierPreds = _df[_df['predictor name']=='Classifier']
+        self._predPerfByName = self._nonClassifierPreds[['model name', 'predictor name', 'predictor performance']].drop_duplicates()
+        return _df
+
+    @property
+    def latestPredModel(self):
+        """ Latest predictor data merged with all latest model columns
+
+        The merge is built lazily on first access and cached, so reports that
+        never need the full model columns do not pay for it
+        """
+        if self._latestPredModel is None:
+            self._latestPredModel = self.latestModels.merge(
+                self.latestPredictors.drop(columns='model name'), on='model ID', how='right').drop(['predictor snapshot'], axis=1)
+        return self._latestPredModel
+
+    def _apply_pred_query(self, query, df):
+        """ Given a predictor dataframe, it filters the dataframe based on input query
+
+        Query keys that are not predictor columns (e.g. 'issue' or 'channel')
+        are resolved against the latest model snapshots and applied through the
+        matching model IDs, so predictor plots accept the same queries as the
+        fully merged frame
+
+        Args:
+            query (dict): a dict of lists where the key is column name in the dataframe and the corresponding
+                   value is a list of values to keep in the dataframe
+            df (pandas dataframe)
+
+        Returns:
+            filtered pandas dataframe
+        """
+        model_query = {col: val for col, val in query.items() if col not in df.columns}
+        if model_query!={}:
+            query = {col: val for col, val in query.items() if col in df.columns}
+            ids = set(self._apply_query(model_query, self.latestModels)['model ID'])
+            if 'model ID' in query:
+                ids &= set(query['model ID'])
+            query['model ID'] = sorted(ids)
+        return self._apply_query(query, df)
+
+    def _pred_performance_for_query(self, query):
+        """ One row per model/predictor pair with its performance, after applying the query
+
+        The unfiltered frame is precomputed in _create_pred_model_df so the
+        plot methods that derive orderings from it do not recompute it
+
+        Args:
+            query (dict): dict of lists to filter dataframe
+
+        Returns:
+            pandas dataframe
+        """
+        if query=={}:
+            return self._predPerfByName
+        _df_g = self._apply_pred_query(query, self._nonClassifierPreds)
+        return _df_g[['model name', 'predictor name', 'predictor performance']].drop_duplicates()
 
     def show_score_distribution(self, query={}, figsize=(14, 10)):
         """ Show score distribution similar to ADM out-of-the-box report
@@ -487,8 +609,7 @@ class ADMReport(ModelReport):
             figsize (tuple): size of graph
         """
 
-        df = self.latestPredModel[self.latestPredModel['predictor name']=='Classifier']
-        df = self._apply_query(query, df).reset_index(drop=True)
+        df = self._apply_pred_query(query, self._classifierPreds).reset_index(drop=True)
         for model in df['model ID'].unique():
             _df = df[df['model ID']==model]
             name = _df['model name'].unique()[0]
@@ -510,7 +631,7 @@ class ADMReport(ModelReport):
         ax1.plot(df.sort_values('bin index')['bin symbol'], df.sort_values('bin index')['bin propensity'], color='orange', marker='o')
         for i in ax.get_xmajorticklabels():
             i.set_rotation(90)
-        labels = [i.get_text()[0:24]+'...' if len(i.get_text())>25 else i.get_text() for i in ax.get_xticklabels()]
+        labels = [s[0:24]+'...' if len(s)>25 else s for s in order]
         ax.set_xticks(ax.get_xticks())
         ax.set_xticklabels(labels)
         ax.set_ylabel('Responses')
@@ -532,8 +653,7 @@ class ADMReport(ModelReport):
             predictors (list): list of predictors to show their graphs. Optional field
             figsize (tuple): size of graph
         """
-        df = self.latestPredModel[self.latestPredModel['predictor name']!='Classifier']
-        df = self._apply_query(query, df).reset_index(drop=True)
+        df = self._apply_pred_query(query, self._nonClassifierPreds).reset_index(drop=True)
         print('Model ID:', df['model ID'].unique())
         if predictors:
             df = df[df['predictor name'].isin(predictors)]
@@ -547,10 +667,14 @@ class ADMReport(ModelReport):
         """ Shows a box plot of predictor performance
         """
         fig, ax = plt.subplots(figsize=figsize)
-        _df_g = self.latestPredModel[self.latestPredModel['predictor name']!='Classifier'].reset_index(drop=True)
-        _df_g = self._apply_query(query, _df_g).reset_index(drop=True)
-        _df_g['legend'] = pd.Series([i.split('.')[0] if len(i.split('.'))>1 else 'Primary' for i in _df_g['predictor name']])
-        order = _df_g.groupby('predictor name')['predictor performance'].mean().fillna(0).sort_values()[::-1].index
+        _df_g = self._apply_pred_query(query, self._nonClassifierPreds).reset_index(drop=True)
+        parts = _df_g['predictor name'].astype(str).str.split('.', n=1, expand=True)
+        if parts.shape[1]>1:
+            _df_g['legend'] = parts[0].where(parts[1].notna(), 'Primary')
+        else:
+            _df_g['legend'] = 'Primary'
+        order = self._pred_performance_for_query(query).groupby(
+            'predictor name', observed=True)['predictor performance'].mean().fillna(0).sort_values()[::-1].index
         sns.boxplot(x='predictor performance', y='predictor name', data=_df_g, order=order, ax=ax)
         ax.set_xlabel('Predictor Performance')
         ax.set_ylabel('Predictor Name')
@@ -580,17 +704,13 @@ class ADMReport(ModelReport):
     def show_model_predictor_performance_heatmap(self, query={}, figsize=(14, 10)):
         """ Shows a heatmap plot of predictor performance across models
         """
-        _df_g_o = self.latestPredModel[self.latestPredModel['predictor name']!='Classifier'].reset_index(drop=True)
-        _df_g_o = self._apply_query(query, _df_g_o).reset_index(drop=True)
-        _df_g = _df_g_o[['model name', 'predictor name', 'predictor performance']].drop_duplicates().pivot(
-            index='model name', columns='predictor name', values='predictor performance')
-        order = list(_df_g_o[[
-            'model name', 'predictor name', 'predictor performance']].drop_duplicates().groupby(
-            'predictor name')['predictor performance'].mean().fillna(0).sort_values()[::-1].index)
+        perf = self._pred_performance_for_query(query)
+        _df_g = perf.pivot(index='model name', columns='predictor name', values='predictor performance')
+        order = list(perf.groupby(
+            'predictor name', observed=True)['predictor performance'].mean().fillna(0).sort_values()[::-1].index)
         _df_g = _df_g[order]*100.0
-        x_order = list(_df_g_o[[
-            'model name', 'predictor name', 'predictor performance']].drop_duplicates().groupby(
-            'model name')['predictor performance'].mean().fillna(0).sort_values()[::-1].index)
+        x_order = list(perf.groupby(
+            'model name', observed=True)['predictor performance'].mean().fillna(0).sort_values()[::-1].index)
         df_g = _df_g.reindex(x_order)
         cmap = colors.LinearSegmentedColormap.from_list(
             'mycmap', [(0/100.0, 'red'), (20/100.0, 'green'),